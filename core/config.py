@@ -1,5 +1,7 @@
+from functools import cached_property, lru_cache
+from urllib.parse import quote, urlunsplit
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -26,6 +28,18 @@ class Settings(BaseSettings):
     # API Configuration
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    ALLOWED_ORIGINS: str = ""  # comma-separated CORS allow-list
+
+    # Logging Configuration
+    LOG_LEVEL: str = "INFO"
+    HOT_PATH_LOG_LEVEL: str = "WARNING"  # per-request *.fetch loggers
+
+    # Auth Token Configuration
+    TOKEN_TTL_SECONDS: int = 86400  # sliding expiry, refreshed on each validation
+    TOKEN_CACHE_TTL_SECONDS: int = 30
+    TOKEN_CACHE_MAXSIZE: int = 10_000
+    AUTH_REDIS_MAX_CONNECTIONS: int = 64
+    AUTH_REDIS_POOL_TIMEOUT_SECONDS: int = 5  # wait for a free connection before failing
 
     # Production Database (Failover)
     SSH_HOST: str
@@ -37,15 +51,35 @@ class Settings(BaseSettings):
     RDS_PASSWORD: str
     RDS_DATABASE: str
     RDS_PORT: int = 3306
+    # Sizes both the RDS connection pool and the fetch executor feeding it
+    RDS_POOL_SIZE: int = 20
 
     # Failover Configuration
     RETRY_ATTEMPTS: int = 2
     RETRY_DELAY_SECONDS: int = 60
     POLLING_INTERVAL_SECONDS: int = 900  # 15 minutes
 
+    @cached_property
+    def REDIS_URL(self) -> str:
+        """Redis connection URL, including the password when one is set"""
+        auth = f":{quote(self.REDIS_PASSWORD, safe='')}@" if self.REDIS_PASSWORD else ""
+        netloc = f"{auth}{self.REDIS_HOST}:{self.REDIS_PORT}"
+        return urlunsplit(("redis", netloc, f"/{self.REDIS_DB}", "", ""))
+
+    @property
+    def allowed_origins_list(self) -> List[str]:
+        """CORS origins parsed from the comma-separated ALLOWED_ORIGINS"""
+        return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",") if origin.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build settings once; .env is parsed on the first call only"""
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,24 @@
+import threading
+from cachetools import TTLCache, cached
+
+
+def cached_health_check(ttl: float = 1):
+    """
+    Reuse a service's health_check() result for `ttl` seconds so status
+    polling doesn't hammer the backend. Call `self.health_check.cache_clear()`
+    after connecting or disconnecting so the next probe is fresh.
+    """
+    def decorator(probe):
+        cache = TTLCache(maxsize=8, ttl=ttl)
+        lock = threading.Lock()
+        # Keyed by instance; the probe itself runs outside the lock
+        wrapper = cached(cache, key=id, lock=lock)(probe)
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
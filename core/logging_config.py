@@ -0,0 +1,42 @@
+import logging
+import time
+import orjson
+from core.config import settings
+
+# Attributes every LogRecord carries; anything else came in via `extra`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Child loggers that carry only per-request logs; their parent modules keep
+# lifecycle INFO logs (connects, mode switches, warm-up) at LOG_LEVEL
+HOT_PATH_LOGGERS = (
+    "routes.user_route.fetch",
+    "services.parallel_fetch_service.fetch",
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Render records as one JSON object per line, merging `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+def configure_logging():
+    """Install the JSON handler on the root logger and quiet per-request loggers"""
+    handler = logging.StreamHandler()
+    handler.setFormatter(JSONFormatter())
+    logging.basicConfig(level=settings.LOG_LEVEL, handlers=[handler], force=True)
+
+    for name in HOT_PATH_LOGGERS:
+        logging.getLogger(name).setLevel(settings.HOT_PATH_LOG_LEVEL)
@@ -1,10 +1,9 @@
-from fastapi import Depends, Header, HTTPException, status
-from services.auth import TokenStore
+from fastapi import Header, HTTPException, status
+from services.auth import get_token_store
 
 
 async def cog_auth_required(
     authorization: str = Header(..., alias="Authorization"),
-    token_store: TokenStore = Depends(),
 ):
     # token validation
     parts = authorization.split(" ", 1)
@@ -21,7 +20,7 @@ async def cog_auth_required(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or missing API key",
         )
-    data = await token_store.validate_token(token)
+    data = await get_token_store().validate_token(token)
     if not data:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
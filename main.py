@@ -3,9 +3,13 @@ Main FastAPI application with authentication
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
+from core.config import settings
+from core.logging_config import configure_logging
 from routes import auth_route, user_route
 from services.redis_service import redis_service
 from services.kafka_service import kafka_service
@@ -13,16 +17,29 @@ from services.trino_service import trino_service
 from services.rds_service import rds_service
 from services.sync_service import sync_service
 from services.datasource_service import datasource_service
+from services.auth import create_redis_pool, close_redis_pool
+from services.health_service import health_service
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
 
+async def _run_stage(*steps):
+    """
+    Run named startup steps concurrently, logging every failure before
+    re-raising the first so one slow backend can't mask another's error
+    """
+    names = [name for name, _ in steps]
+    results = await asyncio.gather(*(aw for _, aw in steps), return_exceptions=True)
+    errors = [(name, r) for name, r in zip(names, results) if isinstance(r, Exception)]
+    for name, error in errors:
+        logger.error(f"{name} failed during startup: {error}")
+    if errors:
+        raise errors[0][1]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -32,21 +49,23 @@ async def lifespan(app: FastAPI):
     logger.info("Starting application...")
     
     try:
-        # Initialize Redis
-        logger.info("Connecting to Redis...")
-        redis_service.connect()
+        # Stage 1: independent backends connect concurrently
+        logger.info("Connecting to Redis, Trino and Kafka...")
+        await _run_stage(
+            ("Redis", asyncio.to_thread(redis_service.connect)),
+            ("Trino", asyncio.to_thread(trino_service.connect)),
+            ("Kafka", asyncio.to_thread(kafka_service.connect))
+        )
         
-        # Initialize Trino
-        logger.info("Connecting to Trino...")
-        trino_service.connect()
+        # Shared async pool for auth token lookups
+        create_redis_pool()
         
-        # Perform initial sync
+        # Stage 2: initial sync needs both Redis and Trino
         logger.info("Performing initial sync from Trino to Redis...")
-        sync_service.initial_sync()
+        await asyncio.to_thread(sync_service.initial_sync)
         
-        # Initialize and start Kafka consumer
+        # Stage 3: start consuming only once the sync has landed
         logger.info("Starting Kafka consumer...")
-        kafka_service.connect()
         kafka_service.start_consuming()
         
         # Initialize RDS (optional, connects on-demand)
@@ -73,11 +92,13 @@ async def lifespan(app: FastAPI):
         # Close connections
         logger.info("Closing service connections...")
         if redis_service:
-            redis_service.close()
+            await redis_service.aclose()
+            redis_service.disconnect()
+        await close_redis_pool()
         if trino_service:
-            trino_service.close()
+            trino_service.disconnect()
         if rds_service:
-            rds_service.close()
+            rds_service.disconnect()
         
         logger.info("Application shut down successfully")
         
@@ -92,16 +113,17 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  
+    allow_origins=settings.allowed_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # Include routers
@@ -144,12 +166,7 @@ async def api_status():
         return {
             "api": "running",
             "current_datasource": datasource_status.get("current_source"),
-            "services": {
-                "redis": "healthy" if redis_service.health_check() else "unhealthy",
-                "kafka": "healthy" if kafka_service.health_check() else "unhealthy",
-                "trino": "healthy" if trino_service.health_check() else "unhealthy",
-                "rds": "healthy" if rds_service.health_check() else "unhealthy"
-            }
+            "services": await health_service.get_all()
         }
     except Exception as e:
         logger.error(f"Error getting status: {e}")
@@ -160,11 +177,22 @@ async def api_status():
 
 
 if __name__ == "__main__":
+    import os
+    from importlib.util import find_spec
     import uvicorn
+    
+    # uvloop has no Windows build; fall back to the stdlib loop there
+    loop = "uvloop" if find_spec("uvloop") else "asyncio"
+    
+    # Datasource mode and the Kafka consumer live in-process, so more than
+    # one worker must be opted into explicitly via WEB_CONCURRENCY
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True, 
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        loop=loop,
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        reload=os.getenv("DEBUG") == "1",
         log_level="info"
     )
\ No newline at end of file
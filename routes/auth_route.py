@@ -8,7 +8,7 @@ from schemas.auth_schemas import (
     TokenResponse,
     MessageResponse
 )
-from services.auth import TokenStore
+from services.auth import TokenStore, get_token_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,11 +16,6 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def get_token_store():
-    """Dependency to get TokenStore instance"""
-    return TokenStore()
-
-
 @router.post("/register", response_model=MessageResponse, status_code=201)
 async def register_user(
     user_data: UserRegisterRequest,
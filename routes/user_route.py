@@ -1,15 +1,17 @@
 """
 User routes with authentication protection
 """
-from typing import Optional
+import asyncio
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Path, Depends
+from fastapi.responses import ORJSONResponse
 from schemas.user_schemas import (
-    UserCheckRequest, 
     UserCheckResponse, 
-    UserExistenceResult,
     HealthResponse,
     UserData,
-    UserDataResponse
+    UserDataResponse,
+    USER_IDS_RE,
+    MAX_USER_ID_DIGITS
 )
 from services.redis_service import redis_service
 from services.kafka_service import kafka_service
@@ -18,14 +20,40 @@ from services.rds_service import rds_service
 from services.datasource_service import datasource_service, DataSource
 from services.sync_service import sync_service
 from services.parallel_fetch_service import parallel_fetch_service
+from services.health_service import health_service
 from decorators.auth import cog_auth_required
 import logging
 
 logger = logging.getLogger(__name__)
+# Per-request logs, quieted separately from lifecycle logs (see HOT_PATH_LOGGERS)
+fetch_logger = logging.getLogger(f"{__name__}.fetch")
 
 router = APIRouter()
 
 
+def _parse_user_id(user_id: str) -> int:
+    """Validate and convert a single user ID without list handling"""
+    user_id = user_id.strip()
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_ids cannot be empty")
+    if not (user_id.isascii() and user_id.isdigit()) or len(user_id) > MAX_USER_ID_DIGITS:
+        raise HTTPException(status_code=400, detail=f"Invalid user_id: {user_id}. Must be numeric.")
+    return int(user_id)
+
+
+def _parse_user_ids(user_ids: str) -> List[int]:
+    """Validate a comma-separated ID list in one regex pass, then convert"""
+    if not user_ids or not user_ids.strip():
+        raise HTTPException(status_code=400, detail="user_ids cannot be empty")
+    if not USER_IDS_RE.fullmatch(user_ids):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid user_ids. Must be numeric, comma-separated."
+        )
+    # int() tolerates the surrounding whitespace the regex allowed
+    return list(map(int, user_ids.split(",")))
+
+
 @router.get(
     "/check-user/{user_ids}", 
     response_model=UserCheckResponse,
@@ -35,25 +63,15 @@ async def check_user_exists_get(
     user_ids: str = Path(..., description="Single user ID or comma-separated user IDs (e.g., 116585 or 116585,123456,789012)")
 ):
     try:
-        # Validate and parse user IDs
-        if not user_ids or not user_ids.strip():
-            raise HTTPException(status_code=400, detail="user_ids cannot be empty")
+        user_id_list = _parse_user_ids(user_ids)
+        flags = redis_service.users_exist(user_id_list)
+        results = [
+            {"user_id": user_id, "exists": exists}
+            for user_id, exists in zip(user_id_list, flags)
+        ]
         
-        # Split by comma and validate each ID
-        user_id_list = [uid.strip() for uid in user_ids.split(',')]
-        results = []
-        
-        for uid in user_id_list:
-            if not uid:
-                raise HTTPException(status_code=400, detail="Empty user_id found in comma-separated list")
-            try:
-                user_id_int = int(uid)
-                exists = redis_service.user_exists(user_id_int)
-                results.append(UserExistenceResult(user_id=user_id_int, exists=exists))
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid user_id: {uid}. Must be numeric.")
-        
-        return UserCheckResponse(results=results)
+        # Returned directly so FastAPI skips response_model validation
+        return ORJSONResponse({"results": results})
     
     except HTTPException:
         raise
@@ -81,19 +99,17 @@ async def get_user_data(
     **Requires Authentication**: Include `Authorization: cog-api-token <token>` header
     """
     try:
-        # Parse and validate user IDs
-        if not user_ids or not user_ids.strip():
-            raise HTTPException(status_code=400, detail="user_ids cannot be empty")
+        # Fast path: a single ID in LAKE mode is one int() and one GET
+        if ',' not in user_ids and datasource_service.is_lake_active():
+            user_id = _parse_user_id(user_ids)
+            user_data = redis_service.get_user_data(user_id)
+            if user_data:
+                user_data['source'] = 'redis'
+                return ORJSONResponse({"users": [user_data], "total": 1, "not_found": []})
+            return ORJSONResponse({"users": [], "total": 0, "not_found": [user_id]})
         
-        user_id_list = []
-        for uid in user_ids.split(','):
-            uid = uid.strip()
-            if not uid:
-                raise HTTPException(status_code=400, detail="Empty user_id in list")
-            try:
-                user_id_list.append(int(uid))
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid user_id: {uid}. Must be numeric.")
+        # Parse and validate user IDs
+        user_id_list = _parse_user_ids(user_ids)
         
         # Check if we have too many IDs (limit to 100 for safety)
         # if len(user_id_list) > 100:
@@ -102,28 +118,28 @@ async def get_user_data(
         # Check current data source
         if datasource_service.is_lake_active():
             # LAKE MODE: Get from Redis only
-            logger.info(f"Fetching {len(user_id_list)} user(s) from Redis (LAKE mode)")
+            fetch_logger.info("fetch_users", extra={"count": len(user_id_list), "mode": "lake"})
             
             found_users = []
             not_found = []
             
-            for user_id in user_id_list:
-                user_data = redis_service.get_user_data(user_id)
+            for user_id, user_data in zip(user_id_list, redis_service.get_users_data(user_id_list)):
                 if user_data:
                     user_data['source'] = 'redis'
                     found_users.append(user_data)
                 else:
                     not_found.append(user_id)
             
-            return UserDataResponse(
-                users=found_users,
-                total=len(found_users),
-                not_found=not_found
-            )
+            # Redis dicts already match UserData; skip model construction
+            return ORJSONResponse({
+                "users": found_users,
+                "total": len(found_users),
+                "not_found": not_found
+            })
         
         else:
             # RDS MODE: Parallel fetch from both Redis and RDS
-            logger.info(f"Fetching {len(user_id_list)} user(s) in parallel from Redis and RDS")
+            fetch_logger.info("fetch_users", extra={"count": len(user_id_list), "mode": "rds_parallel"})
             
             if len(user_id_list) == 1:
                 # Single user - use parallel fetch
@@ -135,21 +151,14 @@ async def get_user_data(
                         detail=f"User {user_id_list[0]} not found in any source"
                     )
                 
-                return UserDataResponse(
-                    users=[user_data],
-                    total=1,
-                    not_found=[]
-                )
+                return ORJSONResponse({"users": [user_data], "total": 1, "not_found": []})
             
             else:
                 # Multiple users - batch parallel fetch
                 result = await parallel_fetch_service.fetch_multiple_users_parallel(user_id_list)
                 
-                return UserDataResponse(
-                    users=result['users'],
-                    total=result['total'],
-                    not_found=result['not_found']
-                )
+                # Already shaped like UserDataResponse
+                return ORJSONResponse(result)
         
     except HTTPException:
         raise
@@ -175,10 +184,13 @@ async def switch_to_rds():
         logger.info("Stopping Kafka consumer...")
         kafka_service.stop_consuming()
         
-        # Connect to RDS if not already connected
-        if not rds_service.health_check():
+        # Connect to RDS if not already connected. The SSH tunnel, the pool's
+        # up-front connections and the worker warm-up all block, so keep them
+        # off the event loop
+        if not await asyncio.to_thread(rds_service.health_check):
             logger.info("Connecting to RDS...")
-            rds_service.connect()
+            await asyncio.to_thread(rds_service.connect)
+            await asyncio.to_thread(parallel_fetch_service.warm_up)
         
         # Switch data source
         result = datasource_service.switch_to_rds()
@@ -246,12 +258,7 @@ async def get_datasource_status():
         status = datasource_service.get_status()
         
         # Add health status of each service
-        status["services"] = {
-            "redis": "healthy" if redis_service.health_check() else "unhealthy",
-            "kafka": "healthy" if kafka_service.health_check() else "unhealthy",
-            "trino": "healthy" if trino_service.health_check() else "unhealthy",
-            "rds": "healthy" if rds_service.health_check() else "unhealthy"
-        }
+        status["services"] = await health_service.get_all()
         
         # Add parallel fetch info
         status["parallel_mode"] = datasource_service.is_rds_active()
@@ -279,9 +286,10 @@ async def health_check():
         trino_status == "healthy"
     ]) else "degraded"
     
-    return HealthResponse(
-        status=overall_status,
-        redis=redis_status,
-        kafka=kafka_status,
-        trino=trino_status
-    )
\ No newline at end of file
+    # Polled frequently; returned directly to skip response_model validation
+    return ORJSONResponse({
+        "status": overall_status,
+        "redis": redis_status,
+        "kafka": kafka_status,
+        "trino": trino_status
+    })
\ No newline at end of file
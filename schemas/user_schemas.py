@@ -1,33 +1,15 @@
-from pydantic import BaseModel, Field, validator
+import re
+from pydantic import BaseModel
 from typing import List, Optional
 
+# Longest user ID accepted; BIGINT fits in 19 digits, and the bound keeps
+# int() well under CPython's digit limit for str -> int conversion
+MAX_USER_ID_DIGITS = 19
 
-class UserCheckRequest(BaseModel):
-    user_id: str = Field(..., description="Single user ID or comma-separated user IDs")
-
-    @validator('user_id')
-    def validate_user_id(cls, v):
-        if not v or not v.strip():
-            raise ValueError("user_id cannot be empty")
-        
-        # Split by comma and validate each ID
-        user_ids = [uid.strip() for uid in v.split(',')]
-        for uid in user_ids:
-            if not uid:
-                raise ValueError("Empty user_id found in comma-separated list")
-            try:
-                int(uid)  # Validate that each ID is numeric
-            except ValueError:
-                raise ValueError(f"Invalid user_id: {uid}. Must be numeric.")
-        
-        return v
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "116585"
-            }
-        }
+# One or more numeric IDs separated by commas, surrounding whitespace allowed
+USER_IDS_RE = re.compile(
+    r"\s*[0-9]{1,%d}\s*(?:,\s*[0-9]{1,%d}\s*)*" % (MAX_USER_ID_DIGITS, MAX_USER_ID_DIGITS)
+)
 
 
 class UserExistenceResult(BaseModel):
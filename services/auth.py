@@ -1,30 +1,90 @@
+import os
 import secrets
 import time
+from typing import Optional
+from anyio import CapacityLimiter, to_thread
+from cachetools import TTLCache
 from fastapi import HTTPException
 from redis import asyncio as aioredis
 from helpers.auth.password_handler import hash_password, verify_password
-from pathlib import Path
-from dotenv import load_dotenv
-from core.redis_config import RedisConnectionConfig
+from core.config import settings
 
-# Load environment variables from .env file
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
+# Process-wide cache of recently validated tokens (token -> data)
+_validated_tokens = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+
+# Bounds concurrent bcrypt work so login bursts can't exhaust the thread pool
+_hash_limiter: Optional[CapacityLimiter] = None
+
+
+def _get_hash_limiter() -> CapacityLimiter:
+    """Create the limiter lazily; it has to be built inside the event loop"""
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = CapacityLimiter(max(4, os.cpu_count() or 1))
+    return _hash_limiter
+
+
+# The one holder of the auth Redis pool; created and closed by the app lifespan
+_redis_pool: Optional[aioredis.BlockingConnectionPool] = None
+_token_store: Optional["TokenStore"] = None
+
+
+def create_redis_pool() -> aioredis.BlockingConnectionPool:
+    """
+    Build the shared async Redis pool used by the TokenStore. It blocks when
+    exhausted, so a cold-cache burst queues for a connection instead of failing.
+    """
+    global _redis_pool, _token_store
+    _redis_pool = aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        max_connections=settings.AUTH_REDIS_MAX_CONNECTIONS,
+        timeout=settings.AUTH_REDIS_POOL_TIMEOUT_SECONDS
+    )
+    _token_store = None
+    return _redis_pool
+
+
+async def close_redis_pool():
+    """Disconnect the shared pool and drop the TokenStore bound to it"""
+    global _redis_pool, _token_store
+    if _redis_pool is not None:
+        await _redis_pool.disconnect()
+    _redis_pool = None
+    _token_store = None
+
+
+def get_token_store() -> "TokenStore":
+    """Get the process-wide TokenStore bound to the shared Redis pool"""
+    global _token_store
+    if _redis_pool is None:
+        # Without a pool redis-py would quietly connect to localhost:6379
+        raise RuntimeError("Auth Redis pool is not initialised; call create_redis_pool() first")
+    if _token_store is None:
+        _token_store = TokenStore(aioredis.Redis(connection_pool=_redis_pool))
+    return _token_store
 
 
 class TokenStore:
-    def __init__(self, redis_url=RedisConnectionConfig.REDIS_CONNECTION_HOST, prefix="api_token:", user_prefix="user:"):
-        self.redis_url = redis_url
+    def __init__(self, redis: aioredis.Redis, prefix="api_token:", user_prefix="user:"):
+        self.redis = redis
         self.prefix = prefix
         self.user_prefix = user_prefix
-        self.redis = None
+        # Key prefixes are encoded once; redis accepts bytes keys directly
+        self._prefix_b = (prefix + "_").encode()
+        self._user_prefix_b = (user_prefix + "_").encode()
 
-    async def connect(self):
-        self.redis = aioredis.from_url(self.redis_url, decode_responses=True)
+    def _token_key(self, token: str) -> bytes:
+        return self._prefix_b + token.encode()
+
+    def _user_key(self, email: str) -> bytes:
+        return self._user_prefix_b + email.lower().encode()
 
     async def register_user(self, email: str, password: str):
-        await self.connect()
-        key = f"{self.user_prefix}_{email.lower()}"
+        key = self._user_key(email)
         exists = await self.redis.exists(key)
         if exists:
             raise HTTPException(
@@ -32,7 +92,7 @@ class TokenStore:
                 detail="User already exists"
             )
 
-        hashed = hash_password(password)
+        hashed = await to_thread.run_sync(hash_password, password, limiter=_get_hash_limiter())
         await self.redis.hset(key, mapping={
             "email": email,
             "password": hashed
@@ -40,30 +100,48 @@ class TokenStore:
         return {"email": email, "message": "User registered successfully"}
 
     async def generate_token(self, email: str, password: str):
-        await self.connect()
-        user_key = f"{self.user_prefix}_{email.lower()}"
+        user_key = self._user_key(email)
         user_data = await self.redis.hgetall(user_key)
         if not user_data:
             raise ValueError("User not found")
 
-        if not verify_password(password, user_data.get("password", "")):
+        valid = await to_thread.run_sync(
+            verify_password, password, user_data.get("password", ""),
+            limiter=_get_hash_limiter()
+        )
+        if not valid:
             raise ValueError("Invalid credentials")
 
         token = secrets.token_urlsafe(32)
-        token_key = f"{self.prefix}_{token}"
+        token_key = self._token_key(token)
 
-        await self.redis.hset(token_key, mapping={
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(token_key, mapping={
             "email": email,
             "created_at": str(int(time.time()))
         })
-        # await self.redis.expire(token_key, ttl_seconds)
+        pipe.expire(token_key, settings.TOKEN_TTL_SECONDS)
+        await pipe.execute()
         return token
 
     async def validate_token(self, token: str):
-        await self.connect()
-        key = f"{self.prefix}_{token}"
-        data = await self.redis.hgetall(key)
-        return data if data else None
+        cached = _validated_tokens.get(token)
+        if cached:
+            return cached
+
+        # Lookup and TTL refresh share a single round-trip
+        key = self._token_key(token)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hget(key, "email")
+        pipe.expire(key, settings.TOKEN_TTL_SECONDS)
+        email, _ = await pipe.execute()
+        if not email:
+            return None
+
+        data = {"email": email}
+        _validated_tokens[token] = data
+        return data
 
     async def revoke_token(self, token: str):
-        await self.redis.delete(f"{self.prefix}{token}")
+        _validated_tokens.pop(token, None)
+        await self.redis.delete(self._token_key(token))
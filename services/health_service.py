@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Dict
+from cachetools import TTLCache
+from services.redis_service import redis_service
+from services.kafka_service import kafka_service
+from services.trino_service import trino_service
+from services.rds_service import rds_service
+
+logger = logging.getLogger(__name__)
+
+
+class HealthService:
+    """Runs every backend health check concurrently and caches the summary"""
+
+    def __init__(self, ttl_seconds: int = 5):
+        self._cache: TTLCache = TTLCache(maxsize=1, ttl=ttl_seconds)
+        self._checks = {
+            "redis": redis_service.health_check,
+            "kafka": kafka_service.health_check,
+            "trino": trino_service.health_check,
+            "rds": rds_service.health_check
+        }
+
+    async def get_all(self) -> Dict[str, str]:
+        """Get healthy/unhealthy status for each service"""
+        cached = self._cache.get("services")
+        if cached is not None:
+            return cached
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(check) for check in self._checks.values()),
+            return_exceptions=True
+        )
+        services = {}
+        for name, result in zip(self._checks, results):
+            if isinstance(result, Exception):
+                logger.error(f"{name} health check raised: {result}")
+            services[name] = "healthy" if result is True else "unhealthy"
+        self._cache["services"] = services
+        return services
+
+
+# Singleton instance
+health_service = HealthService()
@@ -1,12 +1,13 @@
-import json
 import logging
+import re
 import threading
 import time
+import orjson
 from kafka import KafkaConsumer
 from kafka.errors import KafkaError
 from typing import Optional, TYPE_CHECKING
 from core.config import settings
-from services.redis_service import redis_service
+from services.redis_service import redis_service, coerce_user_id
 
 # Avoid circular import by using TYPE_CHECKING
 # if TYPE_CHECKING:
@@ -15,49 +16,53 @@ from services.redis_service import redis_service
 logger = logging.getLogger(__name__)
 
 
+# Kafka client log messages that indicate coordinator/broker trouble
+COORDINATOR_WARNING_RE = re.compile(
+    r"NodeNotReadyError|coordinator|Heartbeat session expired|connection failed|timed out|RequestTimedOutError"
+)
+
+
 class KafkaCoordinatorWarningHandler(logging.Handler):
     def __init__(self, kafka_service_instance):
-        super().__init__()
+        # Sub-WARNING records are dropped by Logger.callHandlers before
+        # handle() takes the handler lock
+        super().__init__(level=logging.WARNING)
         self.kafka_service = kafka_service_instance
         self.warning_count = 0
-        self.last_warning_time = 0
+        self.last_warning_time = 0.0
         self.warning_window = 30  # 30 seconds window
         self.warning_threshold = 10  # Trigger after 10 warnings
         
     def emit(self, record):
-        """Process log records"""
+        """
+        Process log records. handle() holds self.lock around emit, so the
+        counter is updated atomically across kafka-python's threads.
+        """
         try:
-            if record.levelno >= logging.WARNING:
-                message = record.getMessage()
+            message = record.getMessage()
+            
+            # Check for coordinator-related warnings
+            if COORDINATOR_WARNING_RE.search(message):
+                # Monotonic so wall-clock jumps can't stretch or reset the window
+                current_time = time.monotonic()
                 
-                # Check for coordinator-related warnings
-                if any(keyword in message for keyword in [
-                    'NodeNotReadyError',
-                    'coordinator',
-                    'Heartbeat session expired',
-                    'connection failed',
-                    'timed out',
-                    'RequestTimedOutError'
-                ]):
-                    current_time = time.time()
-                    
-                    # Reset counter if outside the time window
-                    if current_time - self.last_warning_time > self.warning_window:
-                        self.warning_count = 0
-                    
-                    self.warning_count += 1
-                    self.last_warning_time = current_time
-                    
-                    logger.debug(f"Coordinator warning detected ({self.warning_count}/{self.warning_threshold}): {message[:100]}")
-                    
-                    # Trigger failover if threshold reached
-                    if self.warning_count >= self.warning_threshold:
-                        logger.critical(
-                            f"Detected {self.warning_count} Kafka coordinator warnings in {self.warning_window}s. "
-                            "Lake appears to be down. Triggering failover..."
-                        )
-                        self.kafka_service.consecutive_errors = self.kafka_service.max_consecutive_errors
-                        self.warning_count = 0  # Reset to avoid repeated triggers
+                # Reset counter if outside the time window
+                if current_time - self.last_warning_time > self.warning_window:
+                    self.warning_count = 0
+                
+                self.warning_count += 1
+                self.last_warning_time = current_time
+                
+                logger.debug(f"Coordinator warning detected ({self.warning_count}/{self.warning_threshold}): {message[:100]}")
+                
+                # Trigger failover if threshold reached
+                if self.warning_count >= self.warning_threshold:
+                    logger.critical(
+                        f"Detected {self.warning_count} Kafka coordinator warnings in {self.warning_window}s. "
+                        "Lake appears to be down. Triggering failover..."
+                    )
+                    self.kafka_service.consecutive_errors = self.kafka_service.max_consecutive_errors
+                    self.warning_count = 0  # Reset to avoid repeated triggers
                         
         except Exception as e:
             logger.error(f"Error in Kafka warning handler: {e}")
@@ -72,6 +77,8 @@ class KafkaService:
         self.max_consecutive_errors = 3
         self.warning_handler: Optional[KafkaCoordinatorWarningHandler] = None
         self._failover_triggered = False
+        self.poll_timeout_ms = 500
+        self.max_poll_records = 500
 
     def connect(self):
         """Connect to Kafka"""
@@ -82,8 +89,13 @@ class KafkaService:
                 group_id=settings.KAFKA_GROUP_ID,
                 auto_offset_reset='earliest',
                 enable_auto_commit=True,
-                value_deserializer=lambda m: json.loads(m.decode('utf-8')) if m else None,
-                consumer_timeout_ms=5000,  # 5 second timeout
+                # orjson parses the raw bytes directly, no intermediate str
+                value_deserializer=lambda m: orjson.loads(m) if m else None,
+                max_poll_records=self.max_poll_records,
+                # Fewer, larger fetches; compressed batches are decoded client-side
+                fetch_min_bytes=256 * 1024,
+                fetch_max_wait_ms=self.poll_timeout_ms,
+                max_partition_fetch_bytes=5 * 1024 * 1024,
                 session_timeout_ms=30000,
                 heartbeat_interval_ms=10000,
                 request_timeout_ms=40000
@@ -103,7 +115,6 @@ class KafkaService:
         """Setup custom handler to monitor Kafka warnings"""
         if not self.warning_handler:
             self.warning_handler = KafkaCoordinatorWarningHandler(self)
-            self.warning_handler.setLevel(logging.WARNING)
             
             # Add handler to kafka loggers
             kafka_logger = logging.getLogger('kafka')
@@ -131,71 +142,101 @@ class KafkaService:
         if self.consumer_thread and self.consumer_thread.is_alive():
             self.consumer_thread.join(timeout=5)
 
+    @staticmethod
+    def _extract_user(message) -> Optional[tuple]:
+        """
+        Pull (user_id, consumer_token, platform, device_id) out of a CDC message.
+        Returns None for anything unusable, so one bad record can't fail the batch.
+        """
+        # Skip messages with None value (tombstone messages)
+        if message.value is None:
+            return None
+        
+        payload = message.value.get('payload') if isinstance(message.value, dict) else None
+        after_data = payload.get('after') if isinstance(payload, dict) else None
+        if not isinstance(after_data, dict) or 'user_id' not in after_data:
+            logger.debug(
+                f"Skipping Kafka message at {message.topic}[{message.partition}]@{message.offset}: "
+                "no payload.after user record"
+            )
+            return None
+        
+        user_id = coerce_user_id(after_data['user_id'])
+        if user_id is None:
+            logger.warning(
+                f"Skipping Kafka message at {message.topic}[{message.partition}]@{message.offset}: "
+                f"invalid user_id {after_data['user_id']!r}"
+            )
+            return None
+        
+        get = after_data.get
+        return user_id, get('consumer_token', ''), get('platform', ''), get('device_id', '')
+
     def process_message(self, message):
         """Process a single Kafka message"""
+        self.process_batch([message])
+
+    def process_batch(self, records):
+        """
+        Process the records returned for one partition by a poll.
+        New users are written with one SET NX pipeline; users already in
+        Redis are skipped by NX without a separate existence check.
+        """
         try:
-            # Skip messages with None value (tombstone messages)
-            if message.value is None:
-                logger.debug("Skipping tombstone message")
-                return
+            rows = [row for row in map(self._extract_user, records) if row]
             
-            payload = message.value.get('payload', {})
-            after_data = payload.get('after')
-            
-            if after_data and 'user_id' in after_data:
-                user_id = after_data.get('user_id')
-                consumer_token = after_data.get('consumer_token', '')
-                platform = after_data.get('platform', '')
-                device_id = after_data.get('device_id', '')
-                
-                # Check if user already exists in Redis
-                if not redis_service.user_exists(user_id):
-                    redis_service.add_user_data(user_id, consumer_token, platform, device_id)
-                    logger.info(f"Added new user {user_id} from Kafka to Redis")
-                else:
-                    logger.debug(f"User {user_id} already exists in Redis, skipping")
+            if rows:
+                created = redis_service.add_users_bulk(rows)
+                if created:
+                    logger.info(f"Added {created} new user(s) from Kafka to Redis")
+                logger.debug("Skipped %d user(s) already in Redis", len(rows) - created)
             
             # Reset error counter on successful processing
             self.consecutive_errors = 0
             
         except Exception as e:
-            logger.error(f"Error processing Kafka message: {e}")
+            logger.error(f"Error processing Kafka batch: {e}")
             self.consecutive_errors += 1
 
     def consume_messages(self):
         logger.info("Starting Kafka consumer loop")
         no_message_count = 0
-        max_no_message_iterations = 3
+        # Polls return after poll_timeout_ms when idle: ~15s of silence
+        max_no_message_iterations = 15000 // self.poll_timeout_ms
         
         while self.running:
             try:
-                messages_received = False
-                
-                for message in self.consumer:
-                    if not self.running:
-                        break
-                    self.process_message(message)
-                    messages_received = True
-                    no_message_count = 0  # Reset on successful message
+                batches = self.consumer.poll(
+                    timeout_ms=self.poll_timeout_ms,
+                    max_records=self.max_poll_records
+                )
                 
-                # If no messages in this iteration
-                if not messages_received:
+                if batches:
+                    for records in batches.values():
+                        self.process_batch(records)
+                    no_message_count = 0  # Reset on successful batch
+                else:
                     no_message_count += 1
-                    logger.debug(f"No messages received (iteration {no_message_count}/{max_no_message_iterations})")
                     
                     # If we haven't received messages for too long AND have coordinator warnings
                     if no_message_count >= max_no_message_iterations and self.consecutive_errors > 0:
-                        logger.warning(f"No messages for {no_message_count * 5} seconds with errors")
+                        logger.warning(
+                            f"No messages for {no_message_count * self.poll_timeout_ms // 1000} seconds with errors"
+                        )
                         self.consecutive_errors += 1
+                        no_message_count = 0
                 
             except KafkaError as e:
                 error_msg = str(e)
                 logger.error(f"Kafka error in consumer loop: {error_msg}")
                 self.consecutive_errors += 1
+                # Back off before retrying to prevent a tight error loop
+                time.sleep(1)
                 
             except Exception as e:
                 logger.error(f"Error in Kafka consumer loop: {e}")
                 self.consecutive_errors += 1
+                time.sleep(1)
             
             # Check if we should trigger failover
             if self.consecutive_errors >= self.max_consecutive_errors:
@@ -204,10 +245,6 @@ class KafkaService:
                 )
                 # self._trigger_failover()
                 break
-            
-            # Small sleep to prevent tight loop
-            if self.running:
-                time.sleep(1)
 
     def start_consuming(self):
         """Start consuming messages in a background thread"""
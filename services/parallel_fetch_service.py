@@ -1,30 +1,48 @@
 import logging
 import asyncio
+import threading
 from typing import Optional, Dict, List
 from concurrent.futures import ThreadPoolExecutor
 from services.redis_service import redis_service
 from services.rds_service import rds_service
 
 logger = logging.getLogger(__name__)
+# Per-request logs, quieted separately from lifecycle logs (see HOT_PATH_LOGGERS)
+fetch_logger = logging.getLogger(f"{__name__}.fetch")
 
 
 class ParallelFetchService:
-    def __init__(self, max_workers: int = 10):
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.semaphore = asyncio.Semaphore(max_workers)
+    def __init__(self, max_workers: Optional[int] = None):
+        # Only the blocking pymysql path still needs worker threads, one per pooled connection
+        self.max_workers = max_workers or rds_service.pool_size
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Only RDS is capped, at its pool size; Redis reads are bounded by the client pool
+        self.rds_semaphore = asyncio.Semaphore(rds_service.pool_size)
+    
+    def warm_up(self, timeout: float = 5.0):
+        """
+        Start every executor thread now rather than on first use. Each task
+        blocks on a shared barrier, so none goes idle and the executor has to
+        spawn a fresh thread for every submission. Blocking; call it off the
+        event loop. If a worker is still busy (e.g. a hung query from an earlier
+        RDS session) the barrier times out and warm-up gives up rather than hang.
+        """
+        barrier = threading.Barrier(self.max_workers, timeout=timeout)
+        futures = [self.executor.submit(barrier.wait) for _ in range(self.max_workers)]
+        try:
+            for future in futures:
+                future.result()
+            logger.info("Started %d RDS fetch worker threads", self.max_workers)
+        except threading.BrokenBarrierError:
+            logger.warning(f"RDS fetch worker warm-up timed out after {timeout}s; some workers are busy")
     
     async def fetch_user_from_redis(self, user_id: int) -> Optional[Dict]:
         """Fetch user data from Redis asynchronously"""
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                redis_service.get_user_data,
-                user_id
-            )
+            result = await redis_service.aget_user_data(user_id)
             if result:
                 result['source'] = 'redis'
-                logger.debug(f"Redis returned data for user {user_id}")
+                logger.debug("Redis returned data for user %s", user_id)
             return result
         except Exception as e:
             logger.error(f"Error fetching user {user_id} from Redis: {e}")
@@ -34,94 +52,104 @@ class ParallelFetchService:
         """Fetch user data from RDS asynchronously"""
         try:
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                rds_service.get_user_by_id,
-                user_id
-            )
+            async with self.rds_semaphore:
+                result = await loop.run_in_executor(
+                    self.executor,
+                    rds_service.get_user_by_id,
+                    user_id
+                )
             if result:
                 result['source'] = 'rds'
-                logger.debug(f"RDS returned data for user {user_id}")
+                logger.debug("RDS returned data for user %s", user_id)
             return result
         except Exception as e:
             logger.error(f"Error fetching user {user_id} from RDS: {e}")
             return None
     
+    async def fetch_users_from_rds(self, user_ids: List[int]) -> Dict[int, Dict]:
+        """Fetch many users from RDS in one batched query, keyed by user_id"""
+        try:
+            loop = asyncio.get_event_loop()
+            async with self.rds_semaphore:
+                results = await loop.run_in_executor(
+                    self.executor,
+                    rds_service.get_users_by_ids,
+                    user_ids
+                )
+            for result in results.values():
+                result['source'] = 'rds'
+            return results
+        except Exception as e:
+            logger.error(f"Error fetching {len(user_ids)} users from RDS: {e}")
+            return {}
+    
     async def fetch_user_parallel(self, user_id: int) -> Optional[Dict]:
         """
         Fetch user data from both Redis and RDS in parallel.
         Returns whichever responds first, with Redis preferred if both respond simultaneously.
         """
-        async with self.semaphore:
-            try:
-                # Create tasks for both sources
-                redis_task = asyncio.create_task(self.fetch_user_from_redis(user_id))
-                rds_task = asyncio.create_task(self.fetch_user_from_rds(user_id))
-                
-                # Wait for the first one to complete
-                done, pending = await asyncio.wait(
-                    [redis_task, rds_task],
-                    return_when=asyncio.FIRST_COMPLETED
-                )
-                
-                # Get the first result
-                first_result = None
-                for task in done:
-                    result = task.result()
-                    if result:
-                        first_result = result
-                        logger.info(f"User {user_id} fetched from {result['source']} (fastest)")
-                        break
-                
-                # If first result is None, wait for the other task
-                if not first_result:
-                    for task in pending:
-                        try:
-                            result = await asyncio.wait_for(task, timeout=2.0)
-                            if result:
-                                first_result = result
-                                logger.info(f"User {user_id} fetched from {result['source']} (fallback)")
-                                break
-                        except asyncio.TimeoutError:
-                            logger.warning(f"Timeout waiting for fallback source for user {user_id}")
-                
-                # Cancel any remaining tasks
-                for task in pending:
-                    if not task.done():
-                        task.cancel()
-                
+        tasks = [
+            asyncio.create_task(self.fetch_user_from_redis(user_id)),
+            asyncio.create_task(self.fetch_user_from_rds(user_id))
+        ]
+        try:
+            finished = asyncio.as_completed(tasks)
+            
+            first_result = await next(finished)
+            if first_result:
+                fetch_logger.info("User %s fetched from %s (fastest)", user_id, first_result['source'])
                 return first_result
-                
-            except Exception as e:
-                logger.error(f"Error in parallel fetch for user {user_id}: {e}")
+            
+            # Fastest source missed; give the other one a bounded window
+            try:
+                result = await asyncio.wait_for(next(finished), timeout=2.0)
+            except asyncio.TimeoutError:
+                fetch_logger.warning(f"Timeout waiting for fallback source for user {user_id}")
                 return None
-    
+            if result:
+                fetch_logger.info("User %s fetched from %s (fallback)", user_id, result['source'])
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error in parallel fetch for user {user_id}: {e}")
+            return None
+        finally:
+            # Cancel the loser as soon as a result is settled; no-op for finished tasks
+            for task in tasks:
+                task.cancel()
+
     async def fetch_multiple_users_parallel(self, user_ids: List[int]) -> Dict:
         """
-        Fetch multiple users in parallel, each with Redis/RDS race condition.
+        Fetch multiple users: one pipelined Redis batch first, then only the
+        Redis misses go to RDS as a single batched query.
         Returns dict with found users and not_found user IDs.
         """
         try:
-            # Create tasks for all user IDs
-            tasks = [self.fetch_user_parallel(user_id) for user_id in user_ids]
+            redis_results = await redis_service.aget_users_data(user_ids)
             
-            # Wait for all tasks to complete
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            by_id = {}
+            misses = []
+            for user_id, result in zip(user_ids, redis_results):
+                if result:
+                    result['source'] = 'redis'
+                    by_id[user_id] = result
+                else:
+                    misses.append(user_id)
             
-            # Process results
+            if misses:
+                by_id.update(await self.fetch_users_from_rds(misses))
+            
+            # Keep the caller's ordering
             found_users = []
             not_found = []
-            
-            for user_id, result in zip(user_ids, results):
-                if isinstance(result, Exception):
-                    logger.error(f"Exception fetching user {user_id}: {result}")
-                    not_found.append(user_id)
-                elif result:
-                    found_users.append(result)
+            for user_id in user_ids:
+                if user_id in by_id:
+                    found_users.append(by_id[user_id])
                 else:
                     not_found.append(user_id)
             
-            logger.info(f"Fetched {len(found_users)} users, {len(not_found)} not found")
+            fetch_logger.info("Fetched %d users (%d via RDS), %d not found",
+                              len(found_users), len(misses) - len(not_found), len(not_found))
             
             return {
                 "users": found_users,
@@ -139,4 +167,4 @@ class ParallelFetchService:
 
 
 # Singleton instance
-parallel_fetch_service = ParallelFetchService(max_workers=20)
\ No newline at end of file
+parallel_fetch_service = ParallelFetchService()
\ No newline at end of file
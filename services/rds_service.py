@@ -2,18 +2,40 @@ import pymysql
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime
+from dbutils.pooled_db import PooledDB
 from sshtunnel import SSHTunnelForwarder
 from core.config import settings
+from core.health_cache import cached_health_check
 
 logger = logging.getLogger(__name__)
 
 
 class RDSService:
     
-    def __init__(self):
+    def __init__(self, pool_size: int = settings.RDS_POOL_SIZE):
         self.tunnel: Optional[SSHTunnelForwarder] = None
-        self.connection: Optional[pymysql.Connection] = None
+        # Sized to ParallelFetchService's executor so every worker gets a connection
+        self.pool: Optional[PooledDB] = None
+        self.pool_size = pool_size
         self.last_sync_timestamp: Optional[datetime] = None
+        # The table name is fixed for the process, so statements are built once
+        self._query_by_id = (
+            "SELECT user_id, consumer_token, platform, device_id "
+            f"FROM {settings.TRINO_TABLE} WHERE user_id = %s LIMIT 1"
+        )
+        # IN (...) statements keyed by placeholder count; full chunks all share one
+        self._queries_by_ids: Dict[int, str] = {}
+
+    def _query_by_ids(self, count: int) -> str:
+        query = self._queries_by_ids.get(count)
+        if query is None:
+            placeholders = ','.join(['%s'] * count)
+            query = self._queries_by_ids.setdefault(
+                count,
+                "SELECT user_id, platform, device_id "
+                f"FROM {settings.TRINO_TABLE} WHERE user_id IN ({placeholders})"
+            )
+        return query
 
     def connect(self):
         try:
@@ -29,7 +51,15 @@ class RDSService:
             self.tunnel.start()
             logger.info(f"SSH tunnel established on local port: {self.tunnel.local_bind_port}")
             
-            self.connection = pymysql.connect(
+            self.pool = PooledDB(
+                creator=pymysql,
+                # Open every connection up front so the first burst after a
+                # switch doesn't queue behind SSH/MySQL handshakes
+                mincached=self.pool_size,
+                maxcached=self.pool_size,
+                maxconnections=self.pool_size,
+                blocking=True,
+                ping=1,  # check a connection when it is taken from the pool
                 host='127.0.0.1',
                 port=self.tunnel.local_bind_port,
                 user=settings.RDS_USERNAME,
@@ -38,6 +68,7 @@ class RDSService:
                 charset='utf8mb4',
                 cursorclass=pymysql.cursors.DictCursor
             )
+            self.health_check.cache_clear()
             logger.info("Successfully connected to RDS")
             
         except Exception as e:
@@ -46,10 +77,12 @@ class RDSService:
             raise
 
     def disconnect(self):
+        self.health_check.cache_clear()
         try:
-            if self.connection:
-                self.connection.close()
-                logger.info("Closed RDS connection")
+            if self.pool:
+                self.pool.close()
+                self.pool = None
+                logger.info("Closed RDS connection pool")
         except Exception as e:
             logger.error(f"Error closing RDS connection: {e}")
         
@@ -66,14 +99,9 @@ class RDSService:
         Returns user data dict matching UserData schema if found, None otherwise
         """
         try:
-            with self.connection.cursor() as cursor:
-                query = f"""
-                    SELECT user_id, consumer_token, platform, device_id
-                    FROM {settings.TRINO_TABLE}
-                    WHERE user_id = %s
-                    LIMIT 1
-                """
-                cursor.execute(query, (user_id,))
+            conn = self.pool.connection()
+            with conn, conn.cursor() as cursor:
+                cursor.execute(self._query_by_id, (user_id,))
                 row = cursor.fetchone()
                 
                 if not row:
@@ -81,8 +109,10 @@ class RDSService:
                     return None
                 
                 user_data = {
-                    'user_id': row['user_id'],
-                    # 'consumer_token': row['consumer_token'] or '',
+                    # Normalised so callers always see the int the request used
+                    'user_id': int(row['user_id']),
+                    # consumer_token is not served from RDS
+                    'consumer_token': None,
                     'platform': row['platform'] or '',
                     'device_id': row['device_id'] or ''
                 }
@@ -94,12 +124,48 @@ class RDSService:
             logger.error(f"Error fetching user {user_id} from RDS: {e}")
             raise
 
+    def get_users_by_ids(self, user_ids: List[int], chunk_size: int = 1000) -> Dict[int, Dict]:
+        """
+        Get many users from RDS with one IN (...) query per chunk_size IDs,
+        keeping each statement well under max_allowed_packet.
+        Returns user data dicts matching UserData schema, keyed by user_id
+        """
+        users = {}
+        try:
+            conn = self.pool.connection()
+            with conn, conn.cursor() as cursor:
+                for start in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[start:start + chunk_size]
+                    cursor.execute(self._query_by_ids(len(chunk)), chunk)
+                    
+                    for row in cursor.fetchall():
+                        # Keyed by int so lookups by the requested IDs hit
+                        # whatever the column type
+                        user_id = int(row['user_id'])
+                        # First row wins, matching get_user_by_id's LIMIT 1
+                        users.setdefault(user_id, {
+                            'user_id': user_id,
+                            # consumer_token is not served from RDS
+                            'consumer_token': None,
+                            'platform': row['platform'] or '',
+                            'device_id': row['device_id'] or ''
+                        })
+            
+            logger.debug("Retrieved %d of %d users from RDS", len(users), len(user_ids))
+            return users
+                
+        except Exception as e:
+            logger.error(f"Error fetching {len(user_ids)} users from RDS: {e}")
+            raise
+
+    @cached_health_check()
     def health_check(self) -> bool:
         try:
-            if not self.connection or not self.tunnel or not self.tunnel.is_active:
+            if not self.pool or not self.tunnel or not self.tunnel.is_active:
                 return False
             
-            with self.connection.cursor() as cursor:
+            conn = self.pool.connection()
+            with conn, conn.cursor() as cursor:
                 cursor.execute("SELECT 1")
                 cursor.fetchone()
             return True
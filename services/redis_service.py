@@ -1,15 +1,94 @@
+import orjson
 import redis
+import redis.asyncio as aioredis
 import logging
-from typing import Optional, Set, Dict
+from redis.utils import HIREDIS_AVAILABLE
+from typing import Optional, Dict, List, Tuple
 from core.config import settings
+from core.health_cache import cached_health_check
 
 logger = logging.getLogger(__name__)
 
 
+def _user_key(user_id) -> bytes:
+    """
+    Build the user key as bytes, e.g. b"user:42".
+    %-formatting into bytes beats an f-string plus the encode redis-py
+    would otherwise do for a str key.
+    """
+    return b"user:%d" % int(user_id)
+
+
+def coerce_user_id(user_id) -> Optional[int]:
+    """
+    Return user_id as an int, or None if it is missing or not a whole number.
+    Rows from Kafka and Trino go through this before add_users_bulk, so one
+    bad row is skipped instead of failing the whole pipeline.
+    """
+    if isinstance(user_id, int) and not isinstance(user_id, bool):
+        return user_id
+    if isinstance(user_id, (str, bytes)):
+        user_id = user_id.strip()
+        # isdigit() alone admits non-ASCII digits such as "²" that int() rejects
+        if user_id.isascii() and user_id.isdigit() and len(user_id) <= 19:
+            return int(user_id)
+    return None
+
+
+def valid_user_rows(rows) -> Tuple[List[Tuple[int, str, str, str]], int]:
+    """
+    Keep the (user_id, consumer_token, platform, device_id) rows whose
+    user_id coerces to an int. Returns the kept rows and the number dropped.
+    """
+    valid = []
+    for row in rows:
+        user_id = coerce_user_id(row[0])
+        if user_id is not None:
+            valid.append((user_id, *row[1:]))
+    return valid, len(rows) - len(valid)
+
+
+def _encode_user(consumer_token: str, platform: str, device_id: str) -> bytes:
+    """Serialize a user record into the single orjson blob stored at user:{id}"""
+    # Empty strings for nulls, as the old per-field hashes stored them
+    return orjson.dumps({
+        "consumer_token": consumer_token or "",
+        "platform": platform or "",
+        "device_id": device_id or ""
+    })
+
+
+def _load_user(user_id: int, blob) -> Dict[str, any]:
+    """Deserialize a stored blob into a dict matching the UserData schema"""
+    return {"user_id": user_id, **orjson.loads(blob)}
+
+
+def _decode_legacy_user(user_id: int, user_data: Dict) -> Dict[str, any]:
+    """
+    Read a user stored in the old per-field hash layout. Fields are bytes
+    from the sync client and str from the asyncio client.
+    """
+    fields = {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in user_data.items()
+    }
+    return {
+        "user_id": user_id,
+        "consumer_token": fields.get("consumer_token"),
+        "platform": fields.get("platform"),
+        "device_id": fields.get("device_id")
+    }
+
+
 class RedisService:
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
-        self.user_set_key = "user_ids"
+        # Native asyncio client for request-path reads (no executor hop)
+        self.aio_client: Optional[aioredis.Redis] = None
+        # Bumped only when a SET NX actually creates a user
+        self.user_count_key = "user_count"
+        # Pre-blob membership set; read once to seed user_count, never written
+        self.legacy_user_set_key = "user_ids"
         
     def connect(self):
         try:
@@ -18,14 +97,31 @@ class RedisService:
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
                 password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                decode_responses=True,
+                decode_responses=False,  # blobs go straight to orjson.loads
                 socket_connect_timeout=5,
                 socket_keepalive=True,
                 health_check_interval=30
             )
             # Test connection
             self.redis_client.ping()
-            logger.info("Successfully connected to Redis")
+            
+            # Connects lazily on first await, inside the running event loop
+            self.aio_client = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+            self._seed_user_count()
+            self.health_check.cache_clear()
+            # redis-py picks the C hiredis parser by itself when it is installed
+            logger.info(
+                f"Successfully connected to Redis (parser: {'hiredis' if HIREDIS_AVAILABLE else 'python'})"
+            )
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
@@ -33,85 +129,213 @@ class RedisService:
     def disconnect(self):
         if self.redis_client:
             self.redis_client.close()
+            self.health_check.cache_clear()
             logger.info("Disconnected from Redis")
 
-    def add_user_data(self, user_id: int, consumer_token: str, platform: str, device_id: str):
+    async def aclose(self):
+        """Close the asyncio client; must run on the event loop that used it"""
+        if self.aio_client:
+            await self.aio_client.aclose()
+            self.aio_client = None
+
+    def _seed_user_count(self):
+        """Initialise user_count from the legacy user_ids set if it was never set"""
+        if not self.redis_client.exists(self.user_count_key):
+            self.redis_client.set(
+                self.user_count_key,
+                self.redis_client.scard(self.legacy_user_set_key),
+                nx=True
+            )
+
+    def add_user_data(self, user_id: int, consumer_token: str, platform: str, device_id: str) -> bool:
+        """
+        Add a user unless one is already stored. SET NX makes the write its
+        own existence check. Returns True only if the user was created.
+        """
         try:
-            user_key = f"user:{user_id}"
-            user_data = {
-                "consumer_token": consumer_token,
-                "platform": platform,
-                "device_id": device_id
-            }
-            
-            # Use pipeline for atomic operations - faster
-            pipe = self.redis_client.pipeline()
-            pipe.sadd(self.user_set_key, str(user_id))
-            pipe.hset(user_key, mapping=user_data)
-            pipe.execute()
-            
-            logger.debug(f"Added user {user_id} to Redis")
-            return True
+            created = self.redis_client.set(
+                _user_key(user_id), _encode_user(consumer_token, platform, device_id), nx=True
+            )
+            if created:
+                self.redis_client.incr(self.user_count_key)
+                logger.debug("Added user %s to Redis", user_id)
+            return bool(created)
         except Exception as e:
             logger.error(f"Error adding user {user_id} to Redis: {e}")
             return False
 
+    def add_users_bulk(self, rows: List[Tuple[int, str, str, str]]) -> int:
+        """
+        Add many users in one pipeline round-trip, skipping any already stored
+        (SET NX; within a batch the first row for an ID wins).
+        Each row is (user_id, consumer_token, platform, device_id).
+        Returns the number of users created.
+        """
+        if not rows:
+            return 0
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for user_id, consumer_token, platform, device_id in rows:
+                pipe.set(_user_key(user_id), _encode_user(consumer_token, platform, device_id), nx=True)
+            created = sum(1 for ok in pipe.execute() if ok)
+            
+            if created:
+                self.redis_client.incrby(self.user_count_key, created)
+            logger.debug("Added %d of %d users to Redis", created, len(rows))
+            return created
+        except Exception as e:
+            logger.error(f"Error adding {len(rows)} users to Redis: {e}")
+            raise
+
     def get_user_data(self, user_id: int) -> Optional[Dict[str, any]]:
         """
         Retrieve complete user data from Redis matching UserData schema.
-        Optimized with single hash lookup (no set check needed).
+        Single GET of the user's blob (no set check needed).
         Returns user data dict if found, None otherwise
         """
         try:
-            # Direct hash lookup - fastest approach
-            user_key = f"user:{user_id}"
-            user_data = self.redis_client.hgetall(user_key)
+            user_key = _user_key(user_id)
+            try:
+                blob = self.redis_client.get(user_key)
+            except redis.ResponseError:
+                # WRONGTYPE: user still stored in the old hash layout
+                user_data = self.redis_client.hgetall(user_key)
+                return _decode_legacy_user(user_id, user_data) if user_data else None
             
-            # If hash is empty, user doesn't exist
-            if not user_data:
-                logger.debug(f"User {user_id} not found in Redis")
+            if blob is None:
+                logger.debug("User %s not found in Redis", user_id)
                 return None
             
-            # Since decode_responses=True, no need to decode bytes
-            # Build response matching UserData schema
-            result = {
-                "user_id": user_id,
-                "consumer_token": user_data.get("consumer_token"),
-                "platform": user_data.get("platform"),
-                "device_id": user_data.get("device_id")
-            }
+            logger.debug("Retrieved user %s data from Redis", user_id)
+            return _load_user(user_id, blob)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving user {user_id} data from Redis: {e}")
+            return None
+    
+    async def aget_user_data(self, user_id: int) -> Optional[Dict[str, any]]:
+        """
+        Async version of get_user_data using the native asyncio client.
+        Returns user data dict if found, None otherwise
+        """
+        try:
+            user_key = _user_key(user_id)
+            try:
+                blob = await self.aio_client.get(user_key)
+            except redis.ResponseError:
+                # WRONGTYPE: user still stored in the old hash layout
+                user_data = await self.aio_client.hgetall(user_key)
+                return _decode_legacy_user(user_id, user_data) if user_data else None
+            
+            if blob is None:
+                logger.debug("User %s not found in Redis", user_id)
+                return None
             
-            logger.debug(f"Retrieved user {user_id} data from Redis")
-            return result
+            return _load_user(user_id, blob)
             
         except Exception as e:
             logger.error(f"Error retrieving user {user_id} data from Redis: {e}")
             return None
     
+    async def aget_users_data(self, user_ids: List[int]) -> List[Optional[Dict[str, any]]]:
+        """
+        Async batch lookup: one pipelined GET round-trip on the asyncio client
+        (plus one HGETALL round-trip if any users are in the old hash layout).
+        Returns a list aligned with user_ids, None for users not found.
+        """
+        try:
+            keys = [_user_key(user_id) for user_id in user_ids]
+            pipe = self.aio_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+            blobs = await pipe.execute(raise_on_error=False)
+            
+            results, legacy = self._load_users(user_ids, blobs)
+            if legacy:
+                pipe = self.aio_client.pipeline(transaction=False)
+                for i in legacy:
+                    pipe.hgetall(keys[i])
+                for i, user_data in zip(legacy, await pipe.execute()):
+                    results[i] = _decode_legacy_user(user_ids[i], user_data) if user_data else None
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error retrieving {len(user_ids)} users' data from Redis: {e}")
+            return [None] * len(user_ids)
+    
+    def get_users_data(self, user_ids: List[int]) -> List[Optional[Dict[str, any]]]:
+        """
+        Batch version of get_user_data: one pipelined GET round-trip
+        (plus one HGETALL round-trip if any users are in the old hash layout).
+        Returns a list aligned with user_ids, None for users not found.
+        """
+        try:
+            keys = [_user_key(user_id) for user_id in user_ids]
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+            blobs = pipe.execute(raise_on_error=False)
+            
+            results, legacy = self._load_users(user_ids, blobs)
+            if legacy:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for i in legacy:
+                    pipe.hgetall(keys[i])
+                for i, user_data in zip(legacy, pipe.execute()):
+                    results[i] = _decode_legacy_user(user_ids[i], user_data) if user_data else None
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error retrieving {len(user_ids)} users' data from Redis: {e}")
+            return [None] * len(user_ids)
+    
+    @staticmethod
+    def _load_users(user_ids: List[int], blobs: List) -> Tuple[List[Optional[Dict[str, any]]], List[int]]:
+        """
+        Decode pipelined GET replies. Returns the results list and the
+        indexes that failed with WRONGTYPE (old hash layout) for a follow-up read.
+        """
+        results = []
+        legacy = []
+        for i, (user_id, blob) in enumerate(zip(user_ids, blobs)):
+            if isinstance(blob, redis.ResponseError):
+                legacy.append(i)
+                results.append(None)
+            else:
+                results.append(_load_user(user_id, blob) if blob is not None else None)
+        return results, legacy
+    
     def user_exists(self, user_id: int) -> bool:
         """
-        Check if user exists. Uses SISMEMBER for O(1) lookup.
+        Check if user exists with an O(1) EXISTS on the user key.
         """
         try:
-            return self.redis_client.sismember(self.user_set_key, str(user_id))
+            return bool(self.redis_client.exists(_user_key(user_id)))
         except Exception as e:
             logger.error(f"Error checking user {user_id} existence: {e}")
             return False
 
-    def get_all_user_ids(self) -> Set[str]:
+    def users_exist(self, user_ids: List[int]) -> List[bool]:
+        """
+        Check existence of many users with one pipelined EXISTS round-trip.
+        """
         try:
-            return self.redis_client.smembers(self.user_set_key)
+            pipe = self.redis_client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.exists(_user_key(user_id))
+            return [bool(flag) for flag in pipe.execute()]
         except Exception as e:
-            logger.error(f"Error getting all user IDs: {e}")
-            return set()
+            logger.error(f"Error checking existence of {len(user_ids)} users: {e}")
+            return [False] * len(user_ids)
 
     def get_user_count(self) -> int:
         try:
-            return self.redis_client.scard(self.user_set_key)
+            return int(self.redis_client.get(self.user_count_key) or 0)
         except Exception as e:
             logger.error(f"Error getting user count: {e}")
             return 0
 
+    @cached_health_check()
     def health_check(self) -> bool:
         try:
             return self.redis_client.ping()
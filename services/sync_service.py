@@ -1,9 +1,12 @@
 import logging
-from services.redis_service import redis_service
+from services.redis_service import redis_service, valid_user_rows
 from services.trino_service import trino_service
 
 logger = logging.getLogger(__name__)
 
+# Users written per Redis pipeline during the initial sync
+SYNC_CHUNK_SIZE = 1000
+
 
 class SyncService:
     """Service to sync data from Trino to Redis on startup"""
@@ -18,29 +21,31 @@ class SyncService:
             current_count = redis_service.get_user_count()
             logger.info(f"Current users in Redis: {current_count}")
             
-            # Fetch all users from Trino
-            users = trino_service.fetch_all_users()
+            # Stream users from Trino, writing each chunk as it arrives
+            fetched_count = 0
+            added_count = 0
+            invalid_count = 0
+            
+            for rows in trino_service.iter_users():
+                fetched_count += len(rows)
+                
+                # Drop rows without a usable user_id so they can't fail a pipeline
+                rows, invalid = valid_user_rows(rows)
+                invalid_count += invalid
+                
+                # SET NX skips users already in Redis; Trino rows are
+                # already in add_users_bulk's column order
+                for start in range(0, len(rows), SYNC_CHUNK_SIZE):
+                    added_count += redis_service.add_users_bulk(rows[start:start + SYNC_CHUNK_SIZE])
             
-            if not users:
+            if not fetched_count:
                 logger.warning("No users fetched from Trino")
                 return
             
-            # Add users to Redis (only new ones)
-            added_count = 0
-            skipped_count = 0
-            
-            for user in users:
-                user_id = user.get('user_id')
-                if not redis_service.user_exists(user_id):
-                    redis_service.add_user_data(
-                        user_id,
-                        user.get('consumer_token', ''),
-                        user.get('platform', ''),
-                        user.get('device_id', '')
-                    )
-                    added_count += 1
-                else:
-                    skipped_count += 1
+            if invalid_count:
+                logger.warning(f"Skipped {invalid_count} Trino row(s) with an invalid user_id")
+            
+            skipped_count = fetched_count - added_count - invalid_count
             
             final_count = redis_service.get_user_count()
             logger.info(
@@ -1,7 +1,8 @@
 import trino
 import logging
-from typing import List, Dict, Optional
+from typing import Iterator, List, Optional, Sequence
 from core.config import settings
+from core.health_cache import cached_health_check
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class TrinoService:
                 schema=settings.TRINO_SCHEMA,
                 http_scheme=settings.TRINO_HTTP_SCHEMA
             )
+            self.health_check.cache_clear()
             logger.info("Successfully connected to Trino")
         except Exception as e:
             logger.error(f"Failed to connect to Trino: {e}")
@@ -30,10 +32,18 @@ class TrinoService:
         """Disconnect from Trino"""
         if self.connection:
             self.connection.close()
+            self.health_check.cache_clear()
             logger.info("Disconnected from Trino")
 
-    def fetch_all_users(self) -> List[Dict]:
-        """Fetch all users from Trino data lake"""
+    def iter_users(self, chunk_size: int = 10000) -> Iterator[List[Sequence]]:
+        """
+        Stream all users from the Trino data lake in chunks of chunk_size,
+        so memory stays bounded by one chunk rather than the whole table.
+        Rows are yielded as the driver returns them, in
+        (user_id, consumer_token, platform, device_id) column order,
+        without building a dict per row.
+        """
+        total = 0
         try:
             cursor = self.connection.cursor()
             query = f"""
@@ -41,23 +51,19 @@ class TrinoService:
                 FROM {settings.TRINO_CATALOG}.{settings.TRINO_SCHEMA}.{settings.TRINO_TABLE}
             """
             cursor.execute(query)
-            rows = cursor.fetchall()
             
-            users = []
-            for row in rows:
-                users.append({
-                    "user_id": row[0],
-                    "consumer_token": row[1],
-                    "platform": row[2],
-                    "device_id": row[3]
-                })
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+                yield rows
             
-            logger.info(f"Fetched {len(users)} users from Trino")
-            return users
+            logger.info(f"Fetched {total} users from Trino")
         except Exception as e:
-            logger.error(f"Error fetching users from Trino: {e}")
-            return []
+            logger.error(f"Error fetching users from Trino after {total} rows: {e}")
 
+    @cached_health_check()
     def health_check(self) -> bool:
         """Check Trino health"""
         try:
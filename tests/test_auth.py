@@ -0,0 +1,66 @@
+import pytest
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """The few hash commands TokenStore uses, backed by a dict"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def auth(settings_env):
+    """services.auth, imported at test time so collection never builds Settings"""
+    from services import auth
+    return auth
+
+
+@pytest.fixture
+def token(auth):
+    token = "revoke-me"
+    yield token
+    auth._validated_tokens.pop(token, None)
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_no_longer_validates(auth, token):
+    """Test revoking deletes the stored token and evicts it from the local cache"""
+    _validated_tokens = auth._validated_tokens
+    redis = FakeRedis()
+    store = auth.TokenStore(redis)
+    redis.data[store._token_key(token)] = {"email": "user@example.com"}
+
+    assert await store.validate_token(token) == {"email": "user@example.com"}
+    assert token in _validated_tokens
+
+    await store.revoke_token(token)
+
+    assert store._token_key(token) not in redis.data
+    assert token not in _validated_tokens
+    assert await store.validate_token(token) is None
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def kafka_service_module(settings_env):
+    """services.kafka_service, imported at test time so collection never builds Settings"""
+    from services import kafka_service
+    return kafka_service
+
+
+def _message(value, offset=0):
+    return SimpleNamespace(topic="users", partition=0, offset=offset, value=value)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        [],
+        "not-an-object",
+        {},
+        {"payload": None},
+        {"payload": "not-an-object"},
+        {"payload": {"after": None}},
+        {"payload": {"after": ["user_id"]}},
+        {"payload": {"after": {"platform": "ios"}}},
+        {"payload": {"after": {"user_id": None}}},
+    ],
+    ids=[
+        "tombstone",
+        "list-value",
+        "str-value",
+        "no-payload",
+        "null-payload",
+        "str-payload",
+        "null-after",
+        "list-after",
+        "no-user-id",
+        "null-user-id",
+    ],
+)
+def test_extract_user_skips_unusable_records(kafka_service_module, value):
+    """Test malformed records are skipped rather than raising"""
+    assert kafka_service_module.KafkaService._extract_user(_message(value)) is None
+
+
+def test_extract_user_reads_after_image(kafka_service_module):
+    """Test a CDC record yields a coerced row with empty-string defaults"""
+    value = {"payload": {"after": {"user_id": "42", "platform": "ios"}}}
+    assert kafka_service_module.KafkaService._extract_user(_message(value)) == (42, "", "ios", "")
+
+
+def test_process_batch_writes_good_records_around_a_poison_one(kafka_service_module, monkeypatch):
+    """Test one malformed record in a poll batch doesn't stop the valid ones being written"""
+    written = []
+    monkeypatch.setattr(
+        kafka_service_module.redis_service, "add_users_bulk",
+        lambda rows: written.extend(rows) or len(rows)
+    )
+    service = kafka_service_module.KafkaService()
+    service.process_batch([
+        _message({"payload": {"after": {"user_id": 1, "platform": "ios"}}}, offset=0),
+        _message({"payload": None}, offset=1),
+        _message({"payload": {"after": {"user_id": 3, "platform": "android"}}}, offset=2),
+    ])
+    assert [row[0] for row in written] == [1, 3]
+    assert service.consecutive_errors == 0
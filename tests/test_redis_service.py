@@ -0,0 +1,226 @@
+import pytest
+import redis
+
+
+@pytest.fixture
+def redis_service_module(settings_env):
+    """services.redis_service, imported at test time so collection never builds Settings"""
+    from services import redis_service
+    return redis_service
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (42, 42),
+        ("42", 42),
+        (" 42 ", 42),
+        (b"42", 42),
+        (None, None),
+        ("", None),
+        ("abc", None),
+        ("4.2", None),
+        ("²", None),
+        ("١٢", None),
+        ("9" * 20, None),
+        (True, None),
+        (4.2, None),
+    ],
+    ids=[
+        "int",
+        "str",
+        "padded-str",
+        "bytes",
+        "none",
+        "empty",
+        "non-numeric",
+        "decimal",
+        "superscript-digit",
+        "arabic-indic-digits",
+        "too-long",
+        "bool",
+        "float",
+    ],
+)
+def test_coerce_user_id(redis_service_module, value, expected):
+    """Test user_ids coerce to int, and anything else to None without raising"""
+    assert redis_service_module.coerce_user_id(value) == expected
+
+
+def test_valid_user_rows_drops_bad_ids(redis_service_module):
+    """Test rows with unusable user_ids are dropped and counted, the rest coerced"""
+    rows = [
+        (1, "token-1", "ios", "device-1"),
+        (None, "token-2", "ios", "device-2"),
+        ("3", "token-3", "android", "device-3"),
+        ("²", "token-4", "android", "device-4"),
+    ]
+    valid, dropped = redis_service_module.valid_user_rows(rows)
+    assert valid == [
+        (1, "token-1", "ios", "device-1"),
+        (3, "token-3", "android", "device-3"),
+    ]
+    assert dropped == 2
+
+
+class FakePipeline:
+    """Queues commands and runs them against the fake client on execute()"""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self, raise_on_error=True):
+        results = []
+        for name, args, kwargs in self.calls:
+            try:
+                results.append(getattr(self.client, name)(*args, **kwargs))
+            except redis.ResponseError as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+
+class FakeRedis:
+    """The string, hash and set commands RedisService uses, backed by a dict"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value = self.data.get(key)
+        if isinstance(value, dict):
+            raise redis.ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def hgetall(self, key):
+        value = self.data.get(key)
+        return dict(value) if isinstance(value, dict) else {}
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def incrby(self, key, amount=1):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    def incr(self, key):
+        return self.incrby(key)
+
+    def scard(self, key):
+        return len(self.data.get(key, ()))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class AsyncFakePipeline(FakePipeline):
+    async def execute(self, raise_on_error=True):
+        return FakePipeline.execute(self, raise_on_error)
+
+
+class AsyncFakeRedis:
+    """Awaitable view over a FakeRedis, standing in for the asyncio client"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+    def pipeline(self, transaction=True):
+        return AsyncFakePipeline(self.client)
+
+
+USER_1 = {"user_id": 1, "consumer_token": "token-1", "platform": "ios", "device_id": "device-1"}
+USER_2 = {"user_id": 2, "consumer_token": "token-2", "platform": "android", "device_id": "device-2"}
+
+
+@pytest.fixture
+def service(redis_service_module):
+    """
+    RedisService over a fake client holding user 1 as an orjson blob and
+    user 2 in the legacy per-field hash layout (bytes, as the sync client reads it)
+    """
+    module = redis_service_module
+    client = FakeRedis()
+    client.data[module._user_key(1)] = module._encode_user("token-1", "ios", "device-1")
+    client.data[module._user_key(2)] = {
+        b"consumer_token": b"token-2",
+        b"platform": b"android",
+        b"device_id": b"device-2",
+    }
+
+    service = module.RedisService()
+    service.redis_client = client
+    service.aio_client = AsyncFakeRedis(client)
+    return service
+
+
+@pytest.mark.parametrize("user_id,expected", [(1, USER_1), (2, USER_2), (3, None)], ids=["blob", "legacy-hash", "missing"])
+def test_get_user_data(service, user_id, expected):
+    """Test single reads decode blobs, fall back to HGETALL on WRONGTYPE, and miss cleanly"""
+    assert service.get_user_data(user_id) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("user_id,expected", [(1, USER_1), (2, USER_2), (3, None)], ids=["blob", "legacy-hash", "missing"])
+async def test_aget_user_data(service, user_id, expected):
+    """Test the asyncio single read has the same legacy-hash fallback"""
+    assert await service.aget_user_data(user_id) == expected
+
+
+def test_get_users_data_mixes_blob_and_legacy_hash(service):
+    """Test a batch read keeps request order and re-reads only the WRONGTYPE keys as hashes"""
+    assert service.get_users_data([2, 3, 1]) == [USER_2, None, USER_1]
+
+
+@pytest.mark.asyncio
+async def test_aget_users_data_mixes_blob_and_legacy_hash(service):
+    """Test the asyncio batch read has the same legacy-hash fallback"""
+    assert await service.aget_users_data([2, 3, 1]) == [USER_2, None, USER_1]
+
+
+def test_add_users_bulk_counts_only_created_users(service):
+    """Test SET NX skips stored users and in-batch duplicates, and user_count grows by the created count"""
+    existing = service.redis_client.data[b"user:1"]
+    created = service.add_users_bulk([
+        (1, "other-token", "web", "other-device"),
+        (4, "token-4", "ios", "device-4"),
+        (4, "dup-token", "web", "dup-device"),
+        (5, "token-5", "android", "device-5"),
+    ])
+    assert created == 2
+    assert service.get_user_count() == 2
+    assert service.redis_client.data[b"user:1"] == existing
+    assert service.get_user_data(4)["consumer_token"] == "token-4"
+
+
+def test_seed_user_count_from_legacy_set(service):
+    """Test user_count is seeded from the legacy user_ids set when unset"""
+    service.redis_client.data["user_ids"] = {b"1", b"2"}
+    service._seed_user_count()
+    assert service.get_user_count() == 2
+
+
+def test_seed_user_count_keeps_existing_count(service):
+    """Test an existing user_count is never overwritten by the legacy set size"""
+    service.redis_client.data["user_ids"] = {b"1", b"2"}
+    service.redis_client.data["user_count"] = 7
+    service._seed_user_count()
+    assert service.get_user_count() == 7
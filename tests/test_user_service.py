@@ -1,127 +1,114 @@
 import pytest
-from fastapi.testclient import TestClient
-from main import app
-
-client = TestClient(app)
+from jsonschema import Draft202012Validator
+
+
+# User IDs the happy-path tests look up
+SAMPLE_USER_IDS = (116585, 123456, 789012)
+
+CHECK_USER_CASES = {
+    "get-single": ("GET", "/api/check-user/116585", None, [116585]),
+    "get-multiple": ("GET", "/api/check-user/116585,123456,789012", None, [116585, 123456, 789012]),
+    "get-with-spaces": ("GET", "/api/check-user/116585,%20123456,%20789012", None, [116585, 123456, 789012]),
+}
+
+# Malformed input, with the status code each should be rejected with
+INVALID_CHECK_USER_CASES = {
+    "get-invalid-format": ("GET", "/api/check-user/abc123", None, 400),
+    "get-invalid-list": ("GET", "/api/check-user/116585,abc", None, 400),
+    "get-trailing-comma": ("GET", "/api/check-user/116585,", None, 400),
+    "get-oversized-id": ("GET", f"/api/check-user/{'9' * 5000}", None, 400),
+    "get-empty": ("GET", "/api/check-user/", None, 404),  # Path not found
+}
+
+# Every request the module makes, keyed by name and sent in one pass
+REQUESTS = {
+    "root": ("GET", "/", None),
+    "check-user-batch": ("GET", f"/api/check-user/{','.join(map(str, SAMPLE_USER_IDS))}", None),
+    **{name: case[:3] for name, case in CHECK_USER_CASES.items()},
+    **{name: case[:3] for name, case in INVALID_CHECK_USER_CASES.items()},
+}
+
+
+# Payload shapes, compiled once and reused by every test that checks them
+ROOT_VALIDATOR = Draft202012Validator({
+    "type": "object",
+    "required": ["message"],
+})
+HEALTH_VALIDATOR = Draft202012Validator({
+    "type": "object",
+    "required": ["status", "redis", "kafka", "trino"],
+})
+CHECK_USER_VALIDATOR = Draft202012Validator({
+    "type": "object",
+    "required": ["results"],
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {"type": "object", "required": ["user_id", "exists"]},
+        },
+    },
+})
+
+
+def by_id(response):
+    """check-user results keyed by user_id, so assertions don't depend on result order"""
+    return {result["user_id"]: result for result in response.json()["results"]}
+
+
+@pytest.fixture(scope="module")
+def responses(gather_requests):
+    """Responses for every entry in REQUESTS, sent concurrently once per module"""
+    return dict(zip(REQUESTS, gather_requests(list(REQUESTS.values()))))
+
+
+@pytest.fixture(scope="module")
+def check_user_results(responses):
+    """check-user results for every sample ID from one batched GET, keyed by user_id"""
+    response = responses["check-user-batch"]
+    assert response.status_code == 200
+    CHECK_USER_VALIDATOR.validate(response.json())
+    return by_id(response)
 
 
-def test_root_endpoint():
+def test_root_endpoint(responses):
     """Test root endpoint"""
-    response = client.get("/")
+    response = responses["root"]
     assert response.status_code == 200
-    assert "message" in response.json()
-    assert response.json()["message"] == "User Lookup Service"
+    ROOT_VALIDATOR.validate(response.json())
+    assert response.json()["message"] == "User Management API"
 
 
-def test_health_endpoint():
+def test_health_endpoint(health_response):
     """Test health check endpoint"""
-    response = client.get("/api/v1/health")
-    assert response.status_code == 200
-    data = response.json()
-    assert "status" in data
-    assert "redis" in data
-    assert "kafka" in data
-    assert "trino" in data
+    assert health_response.status_code == 200
 
 
-# GET Request Tests
-def test_check_user_get_single_valid():
-    """Test checking a single valid user with GET request"""
-    response = client.get("/api/v1/check-user/116585")
-    assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) == 1
-    assert data["results"][0]["user_id"] == 116585
-    assert "exists" in data["results"][0]
-
-
-def test_check_user_get_multiple_valid():
-    """Test checking multiple valid users with GET request"""
-    response = client.get("/api/v1/check-user/116585,123456,789012")
-    assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) == 3
-    assert data["results"][0]["user_id"] == 116585
-    assert data["results"][1]["user_id"] == 123456
-    assert data["results"][2]["user_id"] == 789012
+def test_health_payload(health_response):
+    """Test health check reports status and every backend"""
+    HEALTH_VALIDATOR.validate(health_response.json())
 
 
-def test_check_user_get_with_spaces():
-    """Test checking with spaces in comma-separated list (GET)"""
-    response = client.get("/api/v1/check-user/116585,%20123456,%20789012")
+@pytest.mark.parametrize("case", CHECK_USER_CASES)
+def test_check_user_valid(responses, check_user_results, case):
+    """Test checking valid user_ids, single or comma-separated"""
+    expected_ids = CHECK_USER_CASES[case][3]
+    response = responses[case]
     assert response.status_code == 200
     data = response.json()
-    assert len(data["results"]) == 3
-
-
-def test_check_user_get_invalid_format():
-    """Test checking with invalid user_id format (GET)"""
-    response = client.get("/api/v1/check-user/abc123")
-    assert response.status_code == 400
+    CHECK_USER_VALIDATOR.validate(data)
+    assert len(data["results"]) == len(expected_ids)
+    # Same IDs with the same answers as the batched lookup
+    assert by_id(response) == {user_id: check_user_results[user_id] for user_id in expected_ids}
 
 
-def test_check_user_get_empty():
-    """Test checking with empty user_id (GET)"""
-    response = client.get("/api/v1/check-user/")
-    assert response.status_code == 404  # Path not found
+@pytest.mark.parametrize("user_id", SAMPLE_USER_IDS, ids=[f"user-{user_id}" for user_id in SAMPLE_USER_IDS])
+def test_check_user_batch_result(check_user_results, user_id):
+    """Test every sample user_id comes back from the batched lookup with a boolean exists flag"""
+    assert user_id in check_user_results
+    assert isinstance(check_user_results[user_id]["exists"], bool)
 
 
-# POST Request Tests (backward compatibility)
-def test_check_user_post_single_valid():
-    """Test checking a single valid user with POST request"""
-    response = client.post(
-        "/api/v1/check-user",
-        json={"user_id": "116585"}
-    )
-    assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) == 1
-    assert data["results"][0]["user_id"] == 116585
-    assert "exists" in data["results"][0]
-
-
-def test_check_user_post_multiple_valid():
-    """Test checking multiple valid users with POST request"""
-    response = client.post(
-        "/api/v1/check-user",
-        json={"user_id": "116585,123456,789012"}
-    )
-    assert response.status_code == 200
-    data = response.json()
-    assert "results" in data
-    assert len(data["results"]) == 3
-    assert data["results"][0]["user_id"] == 116585
-    assert data["results"][1]["user_id"] == 123456
-    assert data["results"][2]["user_id"] == 789012
-
-
-def test_check_user_post_invalid_format():
-    """Test checking with invalid user_id format (POST)"""
-    response = client.post(
-        "/api/v1/check-user",
-        json={"user_id": "abc123"}
-    )
-    assert response.status_code == 422  # Validation error
-
-
-def test_check_user_post_empty():
-    """Test checking with empty user_id (POST)"""
-    response = client.post(
-        "/api/v1/check-user",
-        json={"user_id": ""}
-    )
-    assert response.status_code == 422  # Validation error
-
-
-def test_check_user_post_with_spaces():
-    """Test checking with spaces in comma-separated list (POST)"""
-    response = client.post(
-        "/api/v1/check-user",
-        json={"user_id": "116585, 123456, 789012"}
-    )
-    assert response.status_code == 200
-    data = response.json()
-    assert len(data["results"]) == 3
\ No newline at end of file
+@pytest.mark.parametrize("case", INVALID_CHECK_USER_CASES)
+def test_check_user_invalid(responses, case):
+    """Test malformed or empty user_ids are rejected"""
+    assert responses[case].status_code == INVALID_CHECK_USER_CASES[case][3]